@@ -1,42 +1,367 @@
 #!/usr/bin/env python3
-import hashlib, io, json, os, re, sys, time, zipfile, tarfile, urllib.request
+import base64, contextlib, copy, functools, gzip, hashlib, io, json, os, re, sys, time
+import zipfile, tarfile, threading, http.client, urllib.error, urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 import yaml
 
+try:  # optional: orjson serializes large indexes much faster than stdlib json
+    import orjson
+except ImportError:
+    orjson = None
+
 GITHUB_API = "https://api.github.com"
+GITHUB_GRAPHQL = "https://api.github.com/graphql"
+GRAPHQL_RELEASES = 30  # same as the REST /releases default page
+GRAPHQL_ASSETS = 100
+CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache"
+# bump when the way packages are built from releases changes, so package
+# lists cached by an older build are discarded
+CACHE_SCHEMA = 1
+MAX_SOURCE_WORKERS = 8
+MAX_ASSET_WORKERS = 4
+MANIFEST_NAMES = ("manifest.json", "metadata.json")
+ZIP_TAIL_BYTES = 1 << 16  # enough for the central directory of most packages
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.xz", ".txz", ".tar.bz2", ".tbz2")
+USER_AGENT = "jal-kicad-pcm-index"
+HTTP_TIMEOUT = 60
+HTTP_POOL_SIZE = 16  # idle keep-alive connections kept per host
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5
+MAX_REDIRECTS = 5
+
+_log_lock = threading.Lock()
+_log_local = threading.local()
 
 
 def log(msg: str) -> None:
-    print(msg, flush=True)
+    # inside a worker, collect lines so each source's output stays contiguous
+    buf = getattr(_log_local, "lines", None)
+    if buf is not None:
+        buf.append(msg)
+        return
+    with _log_lock:
+        print(msg, flush=True)
+
+
+def run_buffered(fn, *args):
+    """
+    Run fn(*args) with log() buffered; return (result, log_lines). If fn
+    raises, the lines are attached to the exception as `log_lines` so the
+    caller can print them ahead of the traceback.
+    """
+    _log_local.lines = lines = []
+    try:
+        return fn(*args), lines
+    except Exception as e:
+        # nested workers (assets inside a source) already attached theirs
+        e.log_lines = lines + getattr(e, "log_lines", [])
+        raise
+    finally:
+        del _log_local.lines
 
 
 # ------------------------ HTTP / GH API ------------------------
 
+# Idle keep-alive connections shared by all worker threads, keyed by
+# (scheme, host), so repeated requests to api.github.com / the release CDN
+# skip the TCP + TLS handshake.
+_idle_conns = {}
+_pool_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _proxy_for(key):
+    """
+    Return (host, port, headers) of the proxy urlopen would use for key, from
+    the *_PROXY / NO_PROXY environment, or None to connect directly.
+    """
+    scheme, netloc = key
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(netloc):
+        return None
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    p = urllib.parse.urlsplit(proxy)
+    headers = {}
+    if p.username:
+        user, pw = (urllib.parse.unquote(x or "") for x in (p.username, p.password))
+        cred = base64.b64encode(f"{user}:{pw}".encode()).decode("ascii")
+        headers["Proxy-Authorization"] = f"Basic {cred}"
+    return p.hostname, p.port or 80, headers
+
+
+def _new_conn(key):
+    scheme, netloc = key
+    proxy = _proxy_for(key)
+    if proxy:
+        host, port, proxy_headers = proxy
+        if scheme == "https":
+            # CONNECT through the proxy, then TLS end-to-end with netloc
+            conn = http.client.HTTPSConnection(host, port, timeout=HTTP_TIMEOUT)
+            conn.set_tunnel(netloc, headers=proxy_headers)
+            return conn
+        return http.client.HTTPConnection(host, port, timeout=HTTP_TIMEOUT)
+    if scheme == "https":
+        return http.client.HTTPSConnection(netloc, timeout=HTTP_TIMEOUT)
+    return http.client.HTTPConnection(netloc, timeout=HTTP_TIMEOUT)
+
+
+def _acquire_conn(key):
+    with _pool_lock:
+        idle = _idle_conns.get(key)
+        if idle:
+            return idle.pop()
+    return _new_conn(key)
+
+
+def _release_conn(key, conn):
+    with _pool_lock:
+        idle = _idle_conns.setdefault(key, [])
+        if len(idle) < HTTP_POOL_SIZE:
+            idle.append(conn)
+            return
+    conn.close()
+
 
-def gh_api(path, token):
-    req = urllib.request.Request(f"{GITHUB_API}{path}")
+def _send(key, method, path, headers, data):
+    # a pooled connection may have been closed by the server; retry on a fresh one
+    for attempt in range(HTTP_RETRIES):
+        conn = _acquire_conn(key) if attempt == 0 else _new_conn(key)
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            return conn, conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if attempt == HTTP_RETRIES - 1:
+                raise
+            time.sleep(HTTP_BACKOFF * attempt)
+
+
+@contextlib.contextmanager
+def http_open(url, headers=None, data=None):
+    """
+    Open url on a pooled keep-alive connection, following redirects. Yields the
+    http.client.HTTPResponse (with .url set to the final URL); non-2xx answers
+    raise urllib.error.HTTPError, as with urlopen.
+    """
+    headers = {"User-Agent": USER_AGENT, **(headers or {})}
+    method = "GET" if data is None else "POST"
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        req_headers = headers
+        proxy = _proxy_for(key)
+        if proxy and parts.scheme == "http":
+            # plain-HTTP proxies take the absolute URL as the request target
+            path = f"{parts.scheme}://{parts.netloc}{path}"
+            req_headers = {**headers, **proxy[2]}
+        conn, r = _send(key, method, path, req_headers, data)
+
+        location = r.getheader("Location")
+        if r.status in (301, 302, 303, 307, 308) and location:
+            r.read()
+            _release_conn(key, conn)
+            url = urllib.parse.urljoin(url, location)
+            # never forward credentials to another host (e.g. the release CDN)
+            if urllib.parse.urlsplit(url).netloc != parts.netloc:
+                headers.pop("Authorization", None)
+            if r.status == 303:
+                method, data = "GET", None
+            continue
+        if not 200 <= r.status < 300:
+            body = r.read()
+            _release_conn(key, conn)
+            raise urllib.error.HTTPError(
+                url, r.status, r.reason, r.headers, io.BytesIO(body)
+            )
+
+        r.url = url
+        try:
+            yield r
+        finally:
+            # only a fully read response leaves the connection reusable
+            if r.isclosed():
+                _release_conn(key, conn)
+            else:
+                conn.close()
+        return
+    raise urllib.error.URLError(f"too many redirects: {url}")
+
+
+def gh_api(path, token, etag=None):
+    """
+    GET a GitHub API path. Return (json, etag); json is None when `etag` was
+    given and GitHub answered 304 Not Modified.
+    """
+    headers = {"Accept": "application/vnd.github+json", "Accept-Encoding": "gzip"}
     if token:
-        req.add_header("Authorization", f"Bearer {token}")
-    req.add_header("Accept", "application/vnd.github+json")
-    with urllib.request.urlopen(req) as r:
-        return json.load(r)
+        headers["Authorization"] = f"Bearer {token}"
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        with http_open(f"{GITHUB_API}{path}", headers) as r:
+            body = r.read()
+            if r.getheader("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return json.loads(body), r.getheader("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
+
+_RELEASES_FRAGMENT = (
+    "releases(first: %d, orderBy: {field: CREATED_AT, direction: DESC}) "
+    "{ nodes { tagName createdAt releaseAssets(first: %d) "
+    "{ nodes { name downloadUrl size updatedAt digest } } } }"
+) % (GRAPHQL_RELEASES, GRAPHQL_ASSETS)
+
+
+def gh_graphql(query, token):
+    """POST a GraphQL query and return its `data`; errors are logged."""
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip",
+    }
+    body = json.dumps({"query": query}).encode("utf-8")
+    with http_open(GITHUB_GRAPHQL, headers, data=body) as r:
+        raw = r.read()
+        if r.getheader("Content-Encoding") == "gzip":
+            raw = gzip.decompress(raw)
+    out = json.loads(raw)
+    for err in out.get("errors") or []:
+        log(f"WARNING: GraphQL: {err.get('message', err)}")
+    if not out.get("data"):
+        raise ValueError("GraphQL response has no data")
+    return out["data"]
+
+
+def fetch_releases_batch(repos, token):
+    """
+    Fetch releases + assets of every "owner/name" in repos in one GraphQL
+    request. Return {owner/name: releases in REST /releases shape}. Repos that
+    are missing from the answer (or everything, without a token or on error)
+    are left out so the caller falls back to REST for them.
+    """
+    # source ids aren't unique (two owners can share a repo name); key by repo
+    repos = list(dict.fromkeys(repos))
+    if not token or not repos:
+        return {}
+    query = "query {\n%s\n}" % "\n".join(
+        "r%d: repository(owner: %s, name: %s) { %s }"
+        % (i, *(json.dumps(p) for p in repo.split("/", 1)), _RELEASES_FRAGMENT)
+        for i, repo in enumerate(repos)
+    )
+    try:
+        data = gh_graphql(query, token)
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        log(f"WARNING: batched GraphQL release fetch failed ({e}); using REST")
+        return {}
+
+    batched = {}
+    for i, owner_repo in enumerate(repos):
+        repo = data.get(f"r{i}")
+        if not repo:
+            continue
+        # partial answers can hold nulls next to `errors`; such a source
+        # is left out and falls back to REST on its own
+        try:
+            batched[owner_repo] = [
+                {
+                    "tag_name": rel["tagName"],
+                    "created_at": rel["createdAt"],
+                    "assets": [
+                        {
+                            "name": a["name"],
+                            "browser_download_url": a["downloadUrl"],
+                            "size": a["size"],
+                            "updated_at": a["updatedAt"],
+                            **({"digest": a["digest"]} if a.get("digest") else {}),
+                        }
+                        for a in rel["releaseAssets"]["nodes"]
+                    ],
+                }
+                for rel in repo["releases"]["nodes"]
+            ]
+        except (TypeError, KeyError, AttributeError) as e:
+            log(f"WARNING: incomplete GraphQL answer for {owner_repo} ({e!r})")
+    return batched
 
 
 def http_get(url):
-    with urllib.request.urlopen(url) as r:
+    with http_open(url) as r:
         return r.read()
 
 
+def fetch_hashed(url, chunk_size=1 << 16):
+    """Download url, hashing while reading. Return (data, sha256_hex, size)."""
+    h = hashlib.sha256()
+    buf = io.BytesIO()
+    with http_open(url) as r:
+        for chunk in iter(lambda: r.read(chunk_size), b""):
+            h.update(chunk)
+            buf.write(chunk)
+    return buf.getvalue(), h.hexdigest(), buf.tell()
+
+
 # ------------------------ helpers ------------------------
 
 
+_caches = {}
+_cache_lock = threading.Lock()
+
+
+def load_cache(name):
+    """Return the persistent JSON cache `name` under .cache/ (loaded once, shared)."""
+    with _cache_lock:
+        if name not in _caches:
+            try:
+                _caches[name] = json.loads((CACHE_DIR / name).read_text("utf-8"))
+            except (OSError, ValueError):
+                _caches[name] = {}
+        return _caches[name]
+
+
+def save_caches():
+    CACHE_DIR.mkdir(exist_ok=True)
+    with _cache_lock:
+        for name, data in _caches.items():
+            with open(CACHE_DIR / name, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+
+
 def sha256_bytes(b: bytes) -> str:
     h = hashlib.sha256()
     h.update(b)
     return h.hexdigest()
 
 
+def sha256_file(path, buf=1 << 20) -> str:
+    """Hash a file in fixed-size chunks so memory use stays flat."""
+    with open(path, "rb") as f:
+        # 3.11+: the chunk loop runs in C with readinto() on a reused buffer
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(buf), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def dump_json_bytes(obj) -> bytes:
+    """Serialize obj as 2-space indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 def asset_download_url(owner_repo, tag, asset_name):
     owner, repo = owner_repo.split("/", 1)
     return f"https://github.com/{owner}/{repo}/releases/download/{tag}/{asset_name}"
@@ -52,41 +377,163 @@ def now_utc_str():
 
 
 # --- tolerant JSON loader (no deps) ---
-_comment_re = re.compile(
-    r"""(?mx)
-    (//[^\n]*$)            # // line comments
-  | (/\*.*?\*/)            # /* block comments */
-"""
-)
-_trailing_comma_re = re.compile(r",\s*([}\]])")  # , }
+def _strip_jsonc(s: str) -> str:
+    """Drop // and /* */ comments and trailing commas (outside strings) in one pass."""
+    out = []
+    i, n = 0, len(s)
+    in_str = False
+    comma = None  # index in `out` of a comma that may turn out to be trailing
+    while i < n:
+        c = s[i]
+        if in_str:
+            if c == "\\":
+                out.append(s[i : i + 2])
+                i += 2
+                continue
+            if c == '"':
+                in_str = False
+            out.append(c)
+            i += 1
+            continue
+        if s.startswith("//", i):
+            j = s.find("\n", i)
+            i = n if j < 0 else j
+            continue
+        if s.startswith("/*", i):
+            j = s.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+            continue
+        if c in "}]" and comma is not None:
+            out[comma] = ""
+        if not c.isspace():
+            comma = len(out) if c == "," else None
+            in_str = c == '"'
+        out.append(c)
+        i += 1
+    return "".join(out)
 
 
 def json_loads_tolerant(s: str):
     try:
         return json.loads(s)
     except json.JSONDecodeError:
-        # strip comments and most trailing commas, then try once more
-        s2 = _comment_re.sub("", s)
-        s2 = _trailing_comma_re.sub(r"\1", s2)
-        return json.loads(s2)
+        # strip comments and trailing commas, then try once more
+        return json.loads(_strip_jsonc(s))
+
+
+_version_re = re.compile(r"v?(\d+(?:\.\d+)*)(.*)", re.IGNORECASE | re.DOTALL)
+_suffix_re = re.compile(r"([a-z]*)[.\-_]?(\d*)(.*)", re.DOTALL)
+# pre-release labels in ascending order; unknown labels sort below "dev"
+_SUFFIX_RANK = {
+    "dev": 0,
+    "a": 1,
+    "alpha": 1,
+    "b": 2,
+    "beta": 2,
+    "c": 3,
+    "pre": 3,
+    "preview": 3,
+    "rc": 3,
+}
+
+
+def _suffix_key(tail: str):
+    """(label rank, label, number, rest) so "rc10" > "rc2" and "dev1" < "a1"."""
+    label, num, rest = _suffix_re.fullmatch(tail).groups()
+    rank = _SUFFIX_RANK.get(label, -1)
+    # aliases ("b"/"beta") compare equal; only unknown labels compare by name
+    return (rank, label if rank < 0 else "", int(num) if num else 0, rest)
+
+
+def version_key(s: str):
+    """
+    Sort key for version strings: release segments compare numerically
+    ("10.0" > "2.0"), pre-release suffixes ("1.0-rc1") sort before the release
+    and post/local ones ("1.0.post1", "1.0+git") after it. Strings that don't
+    start with a number sort below every parseable version.
+    """
+    m = _version_re.fullmatch(s.strip())
+    if not m:
+        return (0, (), 0, (0, s, 0, ""))
+    nums = tuple(int(x) for x in m.group(1).split("."))
+    while len(nums) > 1 and nums[-1] == 0:  # 1.0 == 1.0.0
+        nums = nums[:-1]
+    suffix = m.group(2)
+    tail = suffix.lstrip(".-_").lower()
+    if not suffix:
+        stage = 1
+    elif suffix.startswith("+") or tail.startswith(("post", "rev")):
+        stage = 2
+    else:
+        stage = 0
+    return (1, nums, stage, _suffix_key(tail))
+
+
+@functools.lru_cache(maxsize=64)
+def _glob_to_rx(pat):
+    # convert simple glob to regex (case-sensitive to match GitHub names exactly)
+    return re.compile(
+        "^" + re.escape(pat).replace(r"\*", ".*").replace(r"\?", ".") + "$"
+    )
+
 
+def _zip_has(z, name):
+    try:
+        z.getinfo(name)
+        return True
+    except KeyError:
+        return False
 
-def _select_manifest_name(names):
+
+def _zip_manifest_name(z):
     """Return 'manifest.json' or 'metadata.json' if present (root or 1st-level)."""
-    # exact root
-    for n in ("manifest.json", "metadata.json"):
-        if n in names:
+    # exact root (O(1) lookups in the zip's own name index)
+    for n in MANIFEST_NAMES:
+        if _zip_has(z, n):
             return n
-    # one top-level folder (GitHub zips often do this)
-    parts = [p.split("/", 1) for p in names if "/" in p]
-    toplevels = set(p[0] for p in parts)
+    # one top-level folder (GitHub zips often do this); bail at a second one
+    root = None
+    for info in z.infolist():
+        top, sep, _ = info.filename.partition("/")
+        if not sep:
+            continue
+        if root is None:
+            root = top
+        elif top != root:
+            return None
+    if root is not None:
+        for n in MANIFEST_NAMES:
+            if _zip_has(z, f"{root}/{n}"):
+                return f"{root}/{n}"
+    return None
+
+
+def _scan_tar_manifest(t):
+    """
+    Walk a TarFile's members lazily (works in stream mode too), keeping only
+    root or first-level manifest candidates. Stops early at a root-level
+    'manifest.json', which always wins. Return (filename, raw_bytes) or (None, None).
+    """
+    candidates, toplevels = {}, set()
+    for m in t:
+        if not m.isfile():
+            continue
+        top, sep, rest = m.name.partition("/")
+        if sep:
+            toplevels.add(top)
+        if (rest if sep else top) in MANIFEST_NAMES and "/" not in rest:
+            candidates[m.name] = t.extractfile(m).read()
+            if m.name == MANIFEST_NAMES[0]:
+                break
+    for n in MANIFEST_NAMES:
+        if n in candidates:
+            return n, candidates[n]
     if len(toplevels) == 1:  # single root folder
         root = next(iter(toplevels))
-        for n in ("manifest.json", "metadata.json"):
-            cand = f"{root}/{n}"
-            if cand in names:
-                return cand
-    return None
+        for n in MANIFEST_NAMES:
+            if f"{root}/{n}" in candidates:
+                return f"{root}/{n}", candidates[f"{root}/{n}"]
+    return None, None
 
 
 def read_manifest_from_archive(blob: bytes):
@@ -97,8 +544,7 @@ def read_manifest_from_archive(blob: bytes):
     # ZIP
     try:
         with zipfile.ZipFile(io.BytesIO(blob)) as z:
-            names = z.namelist()
-            target = _select_manifest_name(names)
+            target = _zip_manifest_name(z)
             if target:
                 try:
                     return json_loads_tolerant(z.read(target).decode("utf-8")), target
@@ -111,14 +557,10 @@ def read_manifest_from_archive(blob: bytes):
     # TAR.* (.tar.gz, .tgz, .tar.xz, etc.)
     try:
         with tarfile.open(fileobj=io.BytesIO(blob), mode="r:*") as t:
-            names = [m.name for m in t.getmembers() if m.isfile()]
-            target = _select_manifest_name(names)
+            target, raw = _scan_tar_manifest(t)
             if target:
                 try:
-                    f = t.extractfile(target)
-                    if not f:
-                        return None, None
-                    return json_loads_tolerant(f.read().decode("utf-8")), target
+                    return json_loads_tolerant(raw.decode("utf-8")), target
                 except Exception as e:
                     log(f"      • parse error in {target}: {e}")
                     return None, None
@@ -128,20 +570,247 @@ def read_manifest_from_archive(blob: bytes):
     return None, None
 
 
+class HashingReader:
+    """Read-only file wrapper that hashes and counts every byte read through it."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.sha = hashlib.sha256()
+        self.size = 0
+
+    def read(self, n=-1):
+        b = self.fp.read(n)
+        self.sha.update(b)
+        self.size += len(b)
+        return b
+
+    def drain(self, chunk_size=1 << 16):
+        while self.read(chunk_size):
+            pass
+
+
+def read_manifest_streaming_tar(url):
+    """
+    Stream a TAR.* asset straight from the HTTP response, keeping only the
+    manifest candidates in memory. Return (manifest_dict, filename, sha256, size);
+    manifest_dict/filename are None when nothing usable was found.
+    """
+    target = raw = None
+    with http_open(url) as r:
+        reader = HashingReader(r)
+        try:
+            with tarfile.open(fileobj=reader, mode="r|*") as t:
+                target, raw = _scan_tar_manifest(t)
+        except tarfile.ReadError:
+            pass
+        # the hash must cover the whole asset, including trailing padding
+        reader.drain()
+    file_sha, file_size = reader.sha.hexdigest(), reader.size
+
+    if not target:
+        return None, None, file_sha, file_size
+    try:
+        manifest = json_loads_tolerant(raw.decode("utf-8"))
+    except Exception as e:
+        log(f"      • parse error in {target}: {e}")
+        return None, None, file_sha, file_size
+    return manifest, target, file_sha, file_size
+
+
+class SeekableHTTPFile:
+    """
+    Read-only, seekable view of a remote file built on HTTP Range requests,
+    just enough for zipfile. The tail of the file (where the central directory
+    lives) is fetched up front; other reads fetch at least `block_size` bytes.
+    """
+
+    def __init__(self, url, tail=ZIP_TAIL_BYTES, block_size=1 << 16):
+        with http_open(url, {"Range": f"bytes=-{tail}"}) as r:
+            if r.status != 206:
+                r.read()
+                raise OSError(f"server ignored Range request (HTTP {r.status})")
+            # Content-Range: bytes <start>-<end>/<total>
+            self.size = int(r.getheader("Content-Range").rsplit("/", 1)[1])
+            # reuse the post-redirect URL so later ranges skip the redirect
+            self.url = r.url
+            data = r.read()
+        self.block_size = block_size
+        self.pos = 0
+        self._windows = [(self.size - len(data), data)]
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.pos = max(0, offset)
+        return self.pos
+
+    def read(self, n=-1):
+        end = self.size if n is None or n < 0 else min(self.size, self.pos + n)
+        if end <= self.pos:
+            return b""
+        for start, data in self._windows:
+            if start <= self.pos and end <= start + len(data):
+                break
+        else:
+            start = self.pos
+            stop = min(self.size, max(end, start + self.block_size))
+            with http_open(self.url, {"Range": f"bytes={start}-{stop - 1}"}) as r:
+                if r.status != 206:
+                    r.read()
+                    raise OSError(f"server ignored Range request (HTTP {r.status})")
+                data = r.read()
+            self._windows.append((start, data))
+        out = data[self.pos - start : end - start]
+        self.pos += len(out)
+        return out
+
+    def close(self):
+        self._windows = []
+
+
+def remote_zip_manifest(url):
+    """
+    Read 'manifest.json' or 'metadata.json' from a remote ZIP using ranged
+    GETs, without downloading the whole archive.
+    Return (manifest_dict, filename) or (None, None).
+    """
+    with zipfile.ZipFile(SeekableHTTPFile(url)) as z:
+        target = _zip_manifest_name(z)
+        if not target:
+            return None, None
+        raw = z.read(target)
+    try:
+        return json_loads_tolerant(raw.decode("utf-8")), target
+    except Exception as e:
+        log(f"      • parse error in {target}: {e}")
+        return None, None
+
+
+def fetch_asset(asset):
+    """Download one release asset. Return (manifest, filename, sha256, size)."""
+    name, url = asset["name"], asset["browser_download_url"]
+    log(f"    - fetch: {name}")
+    if name.lower().endswith(TAR_SUFFIXES):
+        return read_manifest_streaming_tar(url)
+    # GitHub reports "sha256:<hex>" digests for release assets; when we have
+    # one, only the ZIP central directory and the manifest need to be fetched
+    digest = asset.get("digest") or ""
+    if name.lower().endswith(".zip") and digest.startswith("sha256:"):
+        try:
+            manifest, mf_name = remote_zip_manifest(url)
+            return manifest, mf_name, digest.split(":", 1)[1], asset["size"]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            log(f"      • note: ranged read failed ({e}); downloading full asset")
+    data, file_sha, file_size = fetch_hashed(url)
+    manifest, mf_name = read_manifest_from_archive(data)
+    return manifest, mf_name, file_sha, file_size
+
+
 # ------------------------ builders ------------------------
 
 
-def build_from_release_scan(src, token):
+@functools.lru_cache(maxsize=None)
+def local_asset_resources():
+    """Map identifier -> resources found in assets/<identifier>/ (scanned once)."""
+    assets_root = Path(__file__).resolve().parents[1] / "assets"
+    if not assets_root.is_dir():
+        return {}
+    found = {}
+    for p in assets_root.iterdir():
+        if p.is_dir():
+            found[p.name] = {
+                key: f"{p.name}/{fname}"
+                for key, fname in (
+                    ("icon", "icon.png"),
+                    ("screenshot", "screenshot.png"),
+                )
+                if (p / fname).exists()
+            }
+    return found
+
+
+def attach_local_assets(pkg):
+    """Auto-wire local assets into resources (assets/<identifier>/...)."""
+    local = local_asset_resources().get(pkg["identifier"])
+    if local is not None:
+        resources = pkg.setdefault("resources", {})
+        for key, rel in local.items():
+            resources.setdefault(key, rel)
+
+
+def with_local_assets(pkgs):
+    """Copies of pkgs with local assets attached; cached entries stay as built."""
+    pkgs = copy.deepcopy(pkgs)
+    for pkg in pkgs:
+        attach_local_assets(pkg)
+    return pkgs
+
+
+def asset_cache_key(owner_repo, tag, asset):
+    # identical bytes share a digest, so digest keys also dedupe assets that
+    # are re-published across releases or sources
+    digest = asset.get("digest")
+    if digest:
+        return f"{digest}|{asset.get('size', '')}"
+    return "|".join(
+        [
+            owner_repo,
+            tag or "",
+            asset["name"],
+            str(asset.get("size", "")),
+            asset.get("updated_at") or "",
+        ]
+    )
+
+
+def build_from_release_scan(src, token, releases=None):
+    """
+    Build package entries from a repo's release assets. `releases` may be
+    prefetched (see fetch_releases_batch); otherwise /releases is queried.
+    """
     owner_repo = src["repo"]
     glob_pat = src.get("asset_glob", "*.zip")
     only_latest = src.get("only_latest", False)
-    # convert simple glob to regex (case-sensitive to match GitHub names exactly)
-    rx = re.compile(
-        "^" + re.escape(glob_pat).replace(r"\*", ".*").replace(r"\?", ".") + "$"
-    )
+    rx = _glob_to_rx(glob_pat)
 
-    releases = gh_api(f"/repos/{owner_repo}/releases", token)
-    releases.sort(key=lambda r: r.get("created_at", ""), reverse=True)
+    # a cached package list is only reusable for the same scan settings; the
+    # entry is keyed by them too, since source ids aren't unique
+    etags = load_cache("gh_etags.json")
+    path = f"/repos/{owner_repo}/releases"
+    settings = {
+        "schema": CACHE_SCHEMA,
+        "path": path,
+        "asset_glob": glob_pat,
+        "only_latest": only_latest,
+    }
+    cache_key = f"{owner_repo}|{glob_pat}|{only_latest}"
+    cached = etags.get(cache_key)
+    if not cached or cached.get("settings") != settings:
+        cached = None
+
+    if releases is None:
+        releases, etag = gh_api(path, token, etag=cached and cached.get("etag"))
+        fingerprint = None
+        unchanged = releases is None  # 304 Not Modified
+    else:
+        # batched GraphQL answers carry no ETag; compare their content instead
+        etag = None
+        fingerprint = sha256_bytes(json.dumps(releases, sort_keys=True).encode())
+        unchanged = bool(cached) and cached.get("fingerprint") == fingerprint
+    if unchanged:
+        log(f"Scanning repo {owner_repo}: releases unchanged, reusing cache")
+        # assets/ may have changed since, so local resources are re-attached
+        return with_local_assets(cached["packages"])
+    releases = sorted(releases, key=lambda r: r.get("created_at", ""), reverse=True)
+    asset_cache = load_cache("assets.json")
 
     packages = {}
     log(f"Scanning repo {owner_repo} (only_latest={only_latest}, glob='{glob_pat}')")
@@ -151,7 +820,7 @@ def build_from_release_scan(src, token):
         tag = rel.get("tag_name")
         assets = rel.get("assets", [])
         log(f"  release {tag}: {len(assets)} asset(s)")
-        matched = 0
+        matched = []
         for a in assets:
             name = a.get("name")
             url = a.get("browser_download_url")
@@ -161,13 +830,48 @@ def build_from_release_scan(src, token):
             if not rx.match(name):
                 log(f"    - skip: '{name}' (does not match glob)")
                 continue
-            matched += 1
-            log(f"    - fetch: {name}")
-            data = http_get(url)
-            file_sha = sha256_bytes(data)
-            file_size = len(data)
+            matched.append(a)
+
+        # release assets are immutable, so only download ones we haven't seen
+        keys = [asset_cache_key(owner_repo, tag, a) for a in matched]
+        todo = {}
+        for k, a in zip(keys, matched):
+            if k not in asset_cache:
+                todo.setdefault(k, a)
+        todo = list(todo.items())
 
-            manifest, mf_name = read_manifest_from_archive(data)
+        # downloads are independent, so fetch them concurrently; everything
+        # that touches `packages` below stays on this thread
+        fetch_logs = {}
+        if todo:
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_ASSET_WORKERS, len(todo))
+            ) as ex:
+                fetched = list(ex.map(lambda t: run_buffered(fetch_asset, t[1]), todo))
+            for (k, _), ((manifest, mf_name, file_sha, file_size), lines) in zip(
+                todo, fetched
+            ):
+                fetch_logs[k] = lines
+                asset_cache[k] = {
+                    "sha256": file_sha,
+                    "size": file_size,
+                    "manifest": manifest,
+                    "manifest_name": mf_name,
+                }
+
+        for a, k in zip(matched, keys):
+            name = a["name"]
+            lines = fetch_logs.pop(k, None)
+            if lines is not None:
+                for line in lines:
+                    log(line)
+            else:
+                log(f"    - cached: {name}")
+            entry = asset_cache[k]
+            file_sha, file_size = entry["sha256"], entry["size"]
+            mf_name = entry["manifest_name"]
+            # packages below mutate the manifest's nested dicts; keep the cache clean
+            manifest = copy.deepcopy(entry["manifest"])
             if manifest is None or not isinstance(manifest, dict):
                 log("      • skip: no usable manifest.json/metadata.json")
                 continue
@@ -206,23 +910,6 @@ def build_from_release_scan(src, token):
                 },
             )
 
-            # ---- auto-wire local assets into resources (assets/<identifier>/...) ----
-            repo_root = Path(__file__).resolve().parents[1]
-            assets_dir = repo_root / "assets" / pkg_id
-            if assets_dir.exists():
-                pkg.setdefault("resources", {})
-                icon_rel = f"{pkg_id}/icon.png"
-                shot_rel = f"{pkg_id}/screenshot.png"
-                if (assets_dir / "icon.png").exists() and "icon" not in pkg[
-                    "resources"
-                ]:
-                    pkg["resources"]["icon"] = icon_rel
-                if (assets_dir / "screenshot.png").exists() and "screenshot" not in pkg[
-                    "resources"
-                ]:
-                    pkg["resources"]["screenshot"] = shot_rel
-            # ------------------------------------------------------------------------
-
             version_str = (
                 manifest.get("version") or (tag.lstrip("v") if tag else "0.0.0")
             ).strip()
@@ -250,16 +937,25 @@ def build_from_release_scan(src, token):
                 pkg["versions"].append(version_entry)
                 log(f"      • OK: found {mf_name}; version={version_str}")
 
-        if matched == 0:
+        if not matched:
             log("    - note: no assets matched the glob for this release")
         if only_latest:
             break
 
-    # sort versions newest-first (lexicographic fallback)
+    # sort versions newest-first
     for pkg in packages.values():
-        pkg["versions"].sort(key=lambda v: v.get("version", ""), reverse=True)
+        pkg["versions"].sort(
+            key=lambda v: version_key(v.get("version", "")), reverse=True
+        )
 
-    return list(packages.values())
+    if etag or fingerprint:
+        etags[cache_key] = {
+            "settings": settings,
+            "etag": etag,
+            "fingerprint": fingerprint,
+            "packages": list(packages.values()),
+        }
+    return with_local_assets(list(packages.values()))
 
 
 def build_from_mirror(src):
@@ -282,24 +978,57 @@ def main():
 
     token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
 
+    # one GraphQL round-trip for all release_scan sources (REST per source if not)
+    batched = fetch_releases_batch(
+        [s["repo"] for s in sources if s.get("mode") == "release_scan"], token
+    )
+
+    # sources are network-bound, so scan them concurrently; results are
+    # collected per source index to keep packages.json in repos.yaml order
+    results = {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(MAX_SOURCE_WORKERS, len(sources)))
+    ) as ex:
+        futures = {}
+        for i, src in enumerate(sources):
+            mode = src.get("mode")
+            if mode == "release_scan":
+                fut = ex.submit(
+                    run_buffered,
+                    build_from_release_scan,
+                    src,
+                    token,
+                    batched.get(src["repo"]),
+                )
+            elif mode == "mirror_packages_json":
+                fut = ex.submit(run_buffered, build_from_mirror, src)
+            else:
+                log(f"WARNING: unknown mode for source {src.get('id')}")
+                continue
+            futures[fut] = i
+        for fut in as_completed(futures):
+            try:
+                pkgs, lines = fut.result()
+            except Exception as e:
+                # show which source/asset failed before the traceback
+                for line in getattr(e, "log_lines", []):
+                    log(line)
+                raise
+            for line in lines:
+                log(line)
+            results[futures[fut]] = pkgs
+
     all_packages = []
-    for src in sources:
-        mode = src.get("mode")
-        if mode == "release_scan":
-            all_packages.extend(build_from_release_scan(src, token))
-        elif mode == "mirror_packages_json":
-            all_packages.extend(build_from_mirror(src))
-        else:
-            log(f"WARNING: unknown mode for source {src.get('id')}")
+    for i in sorted(results):
+        all_packages.extend(results[i])
 
     # write packages.json (KiCad expects an object with "packages": [...])
     packages_obj = {"packages": all_packages}
     packages_path = repo_root / "packages.json"
-    with open(packages_path, "w", encoding="utf-8") as f:
-        json.dump(packages_obj, f, indent=2, ensure_ascii=False)
+    pk_bytes = dump_json_bytes(packages_obj)
+    packages_path.write_bytes(pk_bytes)
 
     # compute sha on the exact bytes we just wrote
-    pk_bytes = packages_path.read_bytes()
     pk_sha = sha256_bytes(pk_bytes)
     repo_fullname = os.environ.get(
         "GITHUB_REPOSITORY", "justinlevinedotme/jal-kicad-pcm"
@@ -323,17 +1052,16 @@ def main():
     # optional resources.zip
     res_path = repo_root / "resources.zip"
     if res_path.exists():
-        res_bytes = res_path.read_bytes()
         repo_json["resources"] = {
             "url": f"https://raw.githubusercontent.com/{repo_fullname}/main/resources.zip",
-            "sha256": sha256_bytes(res_bytes),
+            "sha256": sha256_file(res_path),
             "update_time_utc": now_utc_str(),
             "update_timestamp": int(time.time()),
         }
 
-    with open(repo_root / "repository.json", "w", encoding="utf-8") as f:
-        json.dump(repo_json, f, indent=2, ensure_ascii=False)
+    (repo_root / "repository.json").write_bytes(dump_json_bytes(repo_json))
 
+    save_caches()
     log(f"Wrote {len(all_packages)} package entries.")
 
 
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import json, re, time
+import hashlib, json, operator, re, time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -8,6 +8,8 @@ README = ROOT / "README.md"
 
 START = "<!-- AUTO-INDEX:START -->"
 END = "<!-- AUTO-INDEX:END -->"
+_BLOCK_RE = re.compile(re.escape(START) + r".*?" + re.escape(END), flags=re.DOTALL)
+_HASH_RE = re.compile(r"<!-- AUTO-INDEX:HASH:([0-9a-f]+) -->")
 
 
 def load_packages():
@@ -21,9 +23,10 @@ def pkg_display_name(pkg):
     return pkg.get("name", pkg.get("identifier", "(unknown)"))
 
 
-def pkg_home_link(pkg):
+def pkg_home_link(pkg, name=None):
     home = (pkg.get("resources") or {}).get("homepage")
-    name = pkg_display_name(pkg)
+    if name is None:
+        name = pkg_display_name(pkg)
     return f"[{name}]({home})" if home else name
 
 
@@ -79,11 +82,7 @@ def normalize_license_field(value):
             if isinstance(v, str) and v.strip():
                 return v.strip()
     if isinstance(value, (list, tuple)):
-        parts = [
-            normalize_license_field(item)
-            for item in value
-            if normalize_license_field(item)
-        ]
+        parts = [s for s in map(normalize_license_field, value) if s]
         return ", ".join(parts) if parts else None
     return None
 
@@ -110,22 +109,27 @@ def get_license(pkg):
 
 
 # ---------- Table ----------
-def pkg_row(pkg):
-    disp = pkg_home_link(pkg)
-    maint = get_maintainer(pkg)
-    lic = get_license(pkg)
-    return f"| {disp} | {maint} | {lic} |"
+def pkg_entry(pkg):
+    """Return (sort_key, package_link, maintainer, license) for one table row."""
+    name = pkg_display_name(pkg)
+    return name.lower(), pkg_home_link(pkg, name), get_maintainer(pkg), get_license(pkg)
 
 
 def build_table(pkgs):
     if not pkgs:
         return "_No packages indexed yet._"
     header = "| 📦 Package | 👤 Maintainer | 🧾 License |\n|---|---|---|"
-    rows = [pkg_row(p) for p in sorted(pkgs, key=lambda x: pkg_display_name(x).lower())]
+    entries = [pkg_entry(p) for p in pkgs]
+    entries.sort(key=operator.itemgetter(0))
+    rows = [f"| {disp} | {maint} | {lic} |" for _, disp, maint, lic in entries]
     return "\n".join([header, *rows])
 
 
 def render_block(pkgs):
+    """
+    Return (block, digest). The digest covers everything except the timestamp,
+    so an unchanged package set can be detected without rewriting README.md.
+    """
     ts = time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime())
     count = len(pkgs)
     table = build_table(pkgs)
@@ -135,7 +139,9 @@ def render_block(pkgs):
         "If a license isn’t specified here, check the upstream repository."
         "While this repository itself is MIT-licensed, the packages included retain their original licenses."
     )
-    return f"""{START}
+    digest = hashlib.sha256(f"{preface}\n{table}\n{count}".encode()).hexdigest()[:16]
+    block = f"""{START}
+<!-- AUTO-INDEX:HASH:{digest} -->
 
 {preface}
 
@@ -143,6 +149,7 @@ def render_block(pkgs):
 
 _Last updated: **{ts}** • Packages: **{count}**_
 {END}"""
+    return block, digest
 
 
 # ---------- README plumbing ----------
@@ -153,15 +160,24 @@ def ensure_markers(text: str) -> str:
 
 
 def replace_block(text: str, new_block: str) -> str:
-    pattern = re.compile(re.escape(START) + r".*?" + re.escape(END), flags=re.DOTALL)
-    return pattern.sub(new_block, text)
+    return _BLOCK_RE.sub(new_block, text)
+
+
+def current_hash(text: str):
+    block = _BLOCK_RE.search(text)
+    m = _HASH_RE.search(block.group(0)) if block else None
+    return m.group(1) if m else None
 
 
 def main():
     pkgs = load_packages()
-    block = render_block(pkgs)
+    block, digest = render_block(pkgs)
     if README.exists():
         content = README.read_text(encoding="utf-8")
+        # only the timestamp would change; leave README.md untouched
+        if current_hash(content) == digest:
+            print("README.md is already up to date.")
+            return
         content = ensure_markers(content)
     else:
         content = (
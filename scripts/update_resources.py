@@ -29,12 +29,28 @@ ROOT = Path(__file__).resolve().parents[1]
 ASSETS = ROOT / "assets"
 OUT_ZIP = ROOT / "resources.zip"
 
+# formats that are already compressed; deflating them again costs CPU for ~0 gain
+STORED_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".zip")
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
 
 def add_dir_to_zip(z: zipfile.ZipFile, base_dir: Path, arc_prefix: str):
-    for path in base_dir.rglob("*"):
+    for path in sorted(base_dir.rglob("*")):
         if path.is_file():
             arcname = f"{arc_prefix}/{path.relative_to(base_dir).as_posix()}"
-            z.write(path, arcname)
+            # fixed timestamp and order: unchanged assets rebuild to identical
+            # bytes, so rewriting resources.zip on every run causes no git churn
+            zinfo = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+            zinfo.external_attr = 0o644 << 16
+            if path.suffix.lower() in STORED_SUFFIXES:
+                z.writestr(zinfo, path.read_bytes(), compress_type=zipfile.ZIP_STORED)
+            else:
+                z.writestr(
+                    zinfo,
+                    path.read_bytes(),
+                    compress_type=zipfile.ZIP_DEFLATED,
+                    compresslevel=1,
+                )
 
 
 def main():